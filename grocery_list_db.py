@@ -1,12 +1,20 @@
-import configparser
+import atexit
+import functools
 import time
 import uuid
+import json
+import logging
 import sqlite3
-import requests
+import struct
 from datetime import datetime, timezone
-from escpos import printer, exceptions
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import groupby
+
+
+log = logging.getLogger(__name__)
 
 
 class BColors:
@@ -24,21 +32,24 @@ class BColors:
 def read_config(config_file='config.ini'):
     """
     Reads printer configuration from the config file. If the file or section does not exist, it creates a default config.
+    USB IDs and endpoints are parsed from hex and chr_width from decimal, so callers get ints.
     Returns:
         dict: A dictionary of configuration values.
     """
+    import configparser
+
     config = configparser.ConfigParser()
     config.read(config_file)
 
     try:
         # Extract configuration values
         config_values = {
-            'idVendor': config.get('Printer', 'idVendor'),
-            'idProduct': config.get('Printer', 'idProduct'),
-            'in_ep': config.get('Printer', 'in_ep'),
-            'out_ep': config.get('Printer', 'out_ep'),
+            'idVendor': int(config.get('Printer', 'idVendor'), 16),
+            'idProduct': int(config.get('Printer', 'idProduct'), 16),
+            'in_ep': int(config.get('Printer', 'in_ep'), 16),
+            'out_ep': int(config.get('Printer', 'out_ep'), 16),
             'profile': config.get('Printer', 'profile'),
-            'chr_width': config.get('Printer', 'chr_width')
+            'chr_width': int(config.get('Printer', 'chr_width'))
         }
     except configparser.NoSectionError:
         # If the section is not found, create a default configuration
@@ -51,7 +62,7 @@ def read_config(config_file='config.ini'):
             'chr_width': '48'
         }
         with open(config_file, 'w') as configfile:
-            config.write(configfile) # noqa
+            config.write(configfile)
         print(BColors.WARNING + "Please use the config.ini file to configure your printer." + BColors.END_C)
         time.sleep(10)
         exit(1)
@@ -67,32 +78,108 @@ def printer_connect(config):
     Returns:
         printer.Usb: The USB printer object.
     """
+    from escpos import printer
+
     return printer.Usb(
-        int(config['idVendor'], 16),
-        int(config['idProduct'], 16),
-        in_ep=int(config['in_ep'], 16),
-        out_ep=int(config['out_ep'], 16),
-        profile=str(config['profile'])
+        config['idVendor'],
+        config['idProduct'],
+        in_ep=config['in_ep'],
+        out_ep=config['out_ep'],
+        profile=config['profile']
     )
 
 
-def check_db(database, tables):
+# Open database connections, keyed by database name
+_connections = {}
+
+
+def _configure(db):
     """
-    Checks if the required tables exist in the database, creates them if not.
+    Applies the connection settings used for every database.
+    WAL with synchronous=NORMAL only syncs at checkpoints and lets readers continue while a write is in progress.
+    Args:
+        db (sqlite3.Connection): Newly opened connection.
+    """
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    db.execute('PRAGMA temp_store=MEMORY')
+    db.execute('PRAGMA cache_size=-20000')  # Negative values are in KiB, so ~20 MB
+    db.execute('PRAGMA mmap_size=268435456')
+    db.execute('PRAGMA foreign_keys=ON')
+
+
+def get_connection(database):
+    """
+    Returns the shared connection to a database, opening it on first use.
+    The connection runs in autocommit mode; use transaction() to group several writes into one commit.
+    Args:
+        database (str): Database name.
+    Returns:
+        sqlite3.Connection: The database connection.
+    """
+    db = _connections.get(database)
+    if db is None:
+        db = sqlite3.connect(f'./.data/{database}.db', isolation_level=None, cached_statements=256)
+        _configure(db)
+        _connections[database] = db
+    return db
+
+
+@atexit.register
+def close_connections():
+    """
+    Closes every open database connection. Registered to run when the program exits.
+    """
+    for db in _connections.values():
+        db.close()
+    _connections.clear()
+
+
+@contextmanager
+def transaction(database):
+    """
+    Runs the enclosed statements as a single transaction, rolling back if an exception is raised.
+    Nested uses join the transaction that is already open.
+    Args:
+        database (str): Database name.
+    Yields:
+        sqlite3.Connection: The database connection.
+    """
+    db = get_connection(database)
+    if db.in_transaction:
+        yield db
+        return
+
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        yield db
+    except BaseException:
+        db.execute('ROLLBACK')
+        raise
+    db.execute('COMMIT')
+
+
+def check_db(database, tables, indexes=()):
+    """
+    Checks if the required tables and indexes exist in the database, creates them if not.
     Args:
         database (str): Database name.
         tables (list): List of tuples, each containing the table name and its creation query.
+        indexes (list, optional): List of tuples, each containing the index name, table name and indexed columns.
     """
-    with sqlite3.connect(f'./.data/{database}.db') as db:
+    with transaction(database) as db:
         cur = db.cursor()
         for table, creation_query in tables:
             cur.execute(f'CREATE TABLE IF NOT EXISTS {table} ({creation_query})')
-        db.commit()
+        for index, table, columns in indexes:
+            cur.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} ({columns})')
 
 
+@functools.cache
 def check_history_db():
     """
     Ensures the history database and required tables exist.
+    Runs once per process; later calls return immediately.
     """
     tables = [
         ('lists',
@@ -101,12 +188,18 @@ def check_history_db():
          'ID INTEGER PRIMARY KEY AUTOINCREMENT, default_lists_id INTEGER, name TEXT NOT NULL, qty INTEGER NOT NULL,'
          'FOREIGN KEY (default_lists_id) REFERENCES lists(UUID)')
     ]
-    check_db('history', tables)
+    # UUID and creation_time are UNIQUE and therefore already indexed; this one covers reading a list's items
+    indexes = [
+        ('idx_li_cov', 'lists_items', 'default_lists_id, name, qty')
+    ]
+    check_db('history', tables, indexes)
 
 
+@functools.cache
 def check_current_db():
     """
     Ensures the current database and required tables exist.
+    Runs once per process; later calls return immediately.
     """
     tables = [
         ('inventory',
@@ -117,9 +210,63 @@ def check_current_db():
         ('default_lists_items',
          'ID INTEGER PRIMARY KEY AUTOINCREMENT, default_lists_id INTEGER, name TEXT NOT NULL, '
          'upc INTEGER UNIQUE NOT NULL, qty INTEGER NOT NULL, description TEXT, time_first_added INTEGER, category TEXT,'
-         'FOREIGN KEY (default_lists_id) REFERENCES default_lists(ID)')
+         'FOREIGN KEY (default_lists_id) REFERENCES default_lists(ID) ON DELETE CASCADE'),
+        ('upc_cache',
+         'upc TEXT PRIMARY KEY, payload BLOB NOT NULL, fetched_at INTEGER NOT NULL')
+    ]
+    # upc columns are UNIQUE and therefore already indexed
+    indexes = [
+        ('idx_inventory_name', 'inventory', 'name'),
+        ('idx_dli_cov', 'default_lists_items', 'default_lists_id, name, qty')
     ]
-    check_db('current', tables)
+    _add_cascade_to_default_lists_items(dict(tables)['default_lists_items'])
+    check_db('current', tables, indexes)
+
+
+def _add_cascade_to_default_lists_items(creation_query):
+    """
+    Rebuilds default_lists_items in databases created before its foreign key had ON DELETE CASCADE.
+    SQLite cannot alter a foreign key, so the rows are copied into a new table; orphaned rows are dropped.
+    Args:
+        creation_query (str): Current column definitions of default_lists_items.
+    """
+    db = get_connection('current')
+    row = db.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'default_lists_items'").fetchone()
+    if row is None or 'ON DELETE CASCADE' in row[0]:
+        return
+
+    with transaction('current'):
+        db.execute(f'CREATE TABLE default_lists_items_new ({creation_query})')
+        db.execute('INSERT INTO default_lists_items_new SELECT * FROM default_lists_items '
+                   'WHERE default_lists_id IN (SELECT ID FROM default_lists)')
+        db.execute('DROP TABLE default_lists_items')
+        db.execute('ALTER TABLE default_lists_items_new RENAME TO default_lists_items')
+
+
+# Columns of every table the helpers below may touch; table and column names are checked against it
+# before they are interpolated into SQL
+_TABLE_COLUMNS = {
+    'inventory': {'ID', 'name', 'upc', 'qty', 'description', 'time_first_added', 'category'},
+    'default_lists': {'ID', 'UUID', 'name'},
+    'default_lists_items': {'ID', 'default_lists_id', 'name', 'upc', 'qty', 'description', 'time_first_added',
+                            'category'},
+    'lists': {'ID', 'UUID', 'creation_time'},
+    'lists_items': {'ID', 'default_lists_id', 'name', 'qty'},
+}
+
+
+def _check_identifiers(db_table, columns=()):
+    """
+    Ensures a table name and column names are known before they are used in a query.
+    Args:
+        db_table (str): Table name.
+        columns (iterable, optional): Column names. Defaults to none.
+    Raises:
+        ValueError: If the table or any of the columns is unknown.
+    """
+    allowed = _TABLE_COLUMNS.get(db_table)
+    if allowed is None or not allowed.issuperset(columns):
+        raise ValueError(f'Unknown table or columns: {db_table} {tuple(columns)}')
 
 
 def search_db(database, db_table, term=None, value=None, sort_by=None, sort_desc=True):
@@ -135,34 +282,190 @@ def search_db(database, db_table, term=None, value=None, sort_by=None, sort_desc
     Returns:
         list: List of matching rows.
     """
-    with sqlite3.connect(f'./.data/{database}.db') as db:
-        cur = db.cursor()
-        if term and value and sort_by:
-            if sort_desc:
-                query = f'SELECT * FROM {db_table} WHERE {term} = ? ORDER BY {sort_by} DESC'
-                cur.execute(query, (value,))
-            else:
-                query = f'SELECT * FROM {db_table} WHERE {term} = ? ORDER BY {sort_by}'
-                cur.execute(query, (value,))
-
-        elif term and value:
-            query = f'SELECT * FROM {db_table} WHERE {term} = ?'
+    _check_identifiers(db_table, [column for column in (term, sort_by) if column])
+    cur = get_connection(database).cursor()
+    if term and value and sort_by:
+        if sort_desc:
+            query = f'SELECT * FROM {db_table} WHERE {term} = ? ORDER BY {sort_by} DESC'
+            cur.execute(query, (value,))
+        else:
+            query = f'SELECT * FROM {db_table} WHERE {term} = ? ORDER BY {sort_by}'
             cur.execute(query, (value,))
 
-        elif sort_by:
-            if sort_desc:
-                query = f'SELECT * FROM {db_table} ORDER BY {sort_by} DESC'
-                cur.execute(query)
+    elif term and value:
+        query = f'SELECT * FROM {db_table} WHERE {term} = ?'
+        cur.execute(query, (value,))
 
-            else:
-                query = f'SELECT * FROM {db_table} ORDER BY {sort_by}'
-                cur.execute(query)
+    elif sort_by:
+        if sort_desc:
+            query = f'SELECT * FROM {db_table} ORDER BY {sort_by} DESC'
+            cur.execute(query)
 
         else:
-            query = f'SELECT * FROM {db_table}'
+            query = f'SELECT * FROM {db_table} ORDER BY {sort_by}'
             cur.execute(query)
 
-        return cur.fetchall()
+    else:
+        query = f'SELECT * FROM {db_table}'
+        cur.execute(query)
+
+    return cur.fetchall()
+
+
+def _search_one(db_table, term, value, columns):
+    """
+    Looks up a single row of the current database, selecting only the requested columns.
+    Args:
+        db_table (str): Table name.
+        term (str): Column name to search in.
+        value (str): Value to match in the column.
+        columns (tuple): Column names to return, in order.
+    Returns:
+        tuple: The matching row, or None if there is no match.
+    """
+    return get_connection('current').execute(_select_one_query(db_table, term, tuple(columns)), (value,)).fetchone()
+
+
+@functools.lru_cache(maxsize=None)
+def _select_one_query(db_table, term, columns):
+    """
+    Validates and builds the single-row SELECT for a table, search column and column tuple,
+    so repeated lookups reuse the same SQL text.
+    Args:
+        db_table (str): Table name.
+        term (str): Column name to search in.
+        columns (tuple): Column names to return, in order.
+    Returns:
+        str: The parameterized SELECT statement.
+    """
+    _check_identifiers(db_table, (term,) + columns)
+    return f'SELECT {", ".join(columns)} FROM {db_table} WHERE {term} = ? LIMIT 1'
+
+
+def search_by_upc(db_table, upc, columns):
+    """
+    Finds the row with the given UPC in a table of the current database.
+    Args:
+        db_table (str): Table name.
+        upc (str): UPC to match.
+        columns (tuple): Column names to return, in order.
+    Returns:
+        tuple: The matching row, or None if there is no match.
+    """
+    return _search_one(db_table, 'upc', upc, columns)
+
+
+def search_by_name(db_table, name, columns):
+    """
+    Finds the first row with the given name in a table of the current database.
+    Args:
+        db_table (str): Table name.
+        name (str): Name to match.
+        columns (tuple): Column names to return, in order.
+    Returns:
+        tuple: The matching row, or None if there is no match.
+    """
+    return _search_one(db_table, 'name', name, columns)
+
+
+# Inserts that always set the same columns are written out once. A UPC that is already in the inventory
+# has its quantity increased instead of failing the whole batch.
+_UPSERT_INVENTORY = ('INSERT INTO inventory (name, upc, qty, description, time_first_added) VALUES (?, ?, ?, ?, ?) '
+                     'ON CONFLICT (upc) DO UPDATE SET qty = qty + excluded.qty')
+_INSERT_LIST = 'INSERT INTO lists (UUID, creation_time) VALUES (?, ?)'
+_INSERT_LIST_ITEM = 'INSERT INTO lists_items (default_lists_id, name, qty) VALUES (?, ?, ?)'
+
+
+@functools.lru_cache(maxsize=None)
+def _insert_query(db_table, columns):
+    """
+    Builds the INSERT statement for a table and column tuple, so repeated inserts reuse the same SQL text.
+    Args:
+        db_table (str): Table name.
+        columns (tuple): Column names being inserted.
+    Returns:
+        str: The parameterized INSERT statement.
+    """
+    _check_identifiers(db_table, columns)
+    return f'INSERT INTO {db_table} ({", ".join(columns)}) VALUES ({", ".join(["?"] * len(columns))})'
+
+
+def iter_table(database, db_table, columns, where=None, params=(), order_by=None):
+    """
+    Yields the rows of a table one at a time, selecting only the requested columns.
+    Args:
+        database (str): Database name.
+        db_table (str): Table name.
+        columns (tuple): Column names to return, in order.
+        where (str, optional): SQL condition limiting the rows. Defaults to None.
+        params (tuple, optional): Parameters for the condition. Defaults to ().
+        order_by (str, optional): Column to sort by. Defaults to None.
+    Yields:
+        tuple: One row per matching record.
+    """
+    _check_identifiers(db_table, tuple(columns) + ((order_by,) if order_by else ()))
+    query = f'SELECT {", ".join(columns)} FROM {db_table}'
+    if where:
+        query += f' WHERE {where}'
+    if order_by:
+        query += f' ORDER BY {order_by}'
+    yield from get_connection(database).execute(query, params)
+
+
+def choose_item(db_table, verb, columns, where=None, params=(), empty_message='The inventory is empty.'):
+    """
+    Lists the items of a table in the current database by name and UPC and asks the user to pick one.
+    Rows are streamed to the screen and only their IDs are kept.
+    Args:
+        db_table (str): Table name.
+        verb (str): What will be done with the item, used in the prompts.
+        columns (tuple): Column names to return for the selected item.
+        where (str, optional): SQL condition limiting the listed rows. Defaults to None.
+        params (tuple, optional): Parameters for the condition. Defaults to ().
+        empty_message (str, optional): Shown when there are no items to list. Defaults to 'The inventory is empty.'.
+    Returns:
+        tuple: The requested columns of the selected item, or None if nothing was selected.
+    Raises:
+        ValueError: If the user does not enter a number.
+    """
+    item_ids = []
+    for idx, (item_id, name, upc) in enumerate(iter_table('current', db_table, ('ID', 'name', 'upc'), where, params),
+                                               start=1):
+        if idx == 1:
+            print(f"Select an item to {verb}:")
+        print(f"{idx}. {name} ({upc})")  # Display the item name
+        item_ids.append(item_id)
+
+    if not item_ids:
+        print(empty_message)
+        return None
+
+    # Prompt the user to select an item
+    selection = int(input(f"Enter the number of the item to {verb} (0 to cancel): "))
+
+    if selection == 0:
+        print("Operation canceled.")
+        return None
+
+    # Validate the selection
+    if not 1 <= selection <= len(item_ids):
+        print("Invalid selection. Please select a valid item number.")
+        return None
+
+    return _search_one(db_table, 'ID', item_ids[selection - 1], columns)
+
+
+def find_list_item(list_id, upc):
+    """
+    Finds an item on a specific default shopping list.
+    Args:
+        list_id (int): ID of the default list.
+        upc (str): UPC of the item.
+    Returns:
+        tuple: A tuple (ID, qty) of the list item, or None if the item is not on the list.
+    """
+    query = 'SELECT ID, qty FROM default_lists_items WHERE default_lists_id = ? AND upc = ? LIMIT 1'
+    return get_connection('current').execute(query, (list_id, upc)).fetchone()
 
 
 def add_remove_db(database, db_table, add=True, **kwargs):
@@ -174,24 +477,19 @@ def add_remove_db(database, db_table, add=True, **kwargs):
         add (bool, optional): True to add, False to remove. Defaults to True.
         **kwargs: Column-value pairs for the database operation.
     """
-    with sqlite3.connect(f'./.data/{database}.db') as db:
-        cur = db.cursor()
-        if add:
-            try:
-                columns = ', '.join(kwargs.keys())
-                placeholders = ', '.join(['?'] * len(kwargs))
-                query = f'INSERT INTO {db_table} ({columns}) VALUES ({placeholders})'
-                cur.execute(query, tuple(kwargs.values()))
-                db.commit()
-            except sqlite3.IntegrityError:
-                print('Already in database.')
+    cur = get_connection(database).cursor()
+    if add:
+        try:
+            cur.execute(_insert_query(db_table, tuple(kwargs)), tuple(kwargs.values()))
+        except sqlite3.IntegrityError:
+            print('Already in database.')
+    else:
+        if 'id' in kwargs:
+            _check_identifiers(db_table)
+            query = f'DELETE FROM {db_table} WHERE ID = ?'
+            cur.execute(query, (kwargs['id'],))
         else:
-            if 'id' in kwargs:
-                query = f'DELETE FROM {db_table} WHERE ID = ?'
-                cur.execute(query, (kwargs['id'],))
-                db.commit()
-            else:
-                print('Can only delete if database ID is known.')
+            print('Can only delete if database ID is known.')
 
 
 def mod_qty_db(database, db_table, db_id, mod=1, add=True):
@@ -204,37 +502,220 @@ def mod_qty_db(database, db_table, db_id, mod=1, add=True):
         mod (int, optional): Amount to modify by. Defaults to 1.
         add (bool, optional): True to add, False to subtract. Defaults to True.
     """
+    _check_identifiers(db_table, ('qty',))
     operation = '+' if add else '-'
-    with sqlite3.connect(f'./.data/{database}.db') as db:
-        cur = db.cursor()
-        query = f'UPDATE {db_table} SET qty = qty {operation} ? WHERE ID = ?'
-        cur.execute(query, (mod, db_id))
-        db.commit()
+    query = f'UPDATE {db_table} SET qty = qty {operation} ? WHERE ID = ?'
+    get_connection(database).execute(query, (mod, db_id))
 
 
-def fetch_info(upc):
+# Seconds an API response stays in upc_cache before it is fetched again
+UPC_CACHE_TTL = 7 * 24 * 60 * 60
+
+# UNIX time until which the API rate limit is used up
+_rate_limit_reset = 0
+
+# Decoded upc_cache entries seen by this process, keyed by UPC, as (fetched_at, product information)
+_upc_memo = {}
+
+
+@functools.cache
+def _get_session():
     """
-    Fetches product information from an external API using UPC.
+    Creates the shared HTTP session on first use, so repeated lookups reuse the same keep-alive connection.
+    requests is only imported here, keeping it off the startup path of code that never looks up a UPC.
+    Returns:
+        requests.Session: Session that retries server-error responses; rate-limited ones are not retried.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.5,
+                                                            status_forcelist=[500, 502, 503, 504],
+                                                            raise_on_status=False)))
+    return session
+
+
+def _cached_info(upc):
+    """
+    Looks up a UPC in upc_cache.
     Args:
         upc (str): The UPC code to search for.
     Returns:
-        tuple: A tuple containing the product information, rate limit remaining, and reset time.
+        list: The cached product information (False if the API had none), or None if there is no fresh entry.
+    """
+    oldest = int(time.time()) - UPC_CACHE_TTL
+    memo = _upc_memo.get(upc)
+    if memo and memo[0] > oldest:
+        return memo[1]
+
+    query = 'SELECT payload, fetched_at FROM upc_cache WHERE upc = ? AND fetched_at > ?'
+    cached = get_connection('current').execute(query, (upc, oldest)).fetchone()
+    if cached is None:
+        return None
+    info = json.loads(cached[0])['items'] or False
+    _upc_memo[upc] = cached[1], info
+    return info
+
+
+def _cache_info(upc, upc_data):
     """
+    Stores an API response in upc_cache.
+    Args:
+        upc (str): The UPC code that was searched for.
+        upc_data (dict): Decoded API response.
+    """
+    fetched_at = int(time.time())
+    get_connection('current').execute('INSERT OR REPLACE INTO upc_cache (upc, payload, fetched_at) VALUES (?, ?, ?)',
+                                      (upc, json.dumps(upc_data).encode('utf-8'), fetched_at))
+    _upc_memo[upc] = fetched_at, upc_data['items'] or False
+
+
+def _request_info(upc):
+    """
+    Requests product information from the API without touching the database, so it is safe to run in a worker thread.
+    Args:
+        upc (str): The UPC code to search for.
+    Returns:
+        tuple: A tuple containing the decoded response (None on failure), rate limit remaining, and reset time.
+    """
+    import requests
+
+    global _rate_limit_reset
+    if time.time() < _rate_limit_reset:
+        return None, '0', str(_rate_limit_reset)
+
     url = f'https://api.upcitemdb.com/prod/trial/lookup?upc={upc}'
-    response = requests.get(url)
 
     try:
-        response.raise_for_status()
-        upc_data = response.json()
+        response = _get_session().get(url, timeout=(3, 10))
         rate_limit_remaining = response.headers.get('X-RateLimit-Remaining', 'N/A')
         rate_limit_reset = response.headers.get('X-RateLimit-Reset', 'N/A')
+        if (rate_limit_remaining == '0' or response.status_code == 429) and rate_limit_reset.isdigit():
+            _rate_limit_reset = int(rate_limit_reset)
+
+        response.raise_for_status()
+        return response.json(), rate_limit_remaining, rate_limit_reset
+    except requests.exceptions.RequestException:
+        return None, '', ''
+
+
+def fetch_info(upc):
+    """
+    Fetches product information from an external API using UPC.
+    Responses are cached in the current database for UPC_CACHE_TTL seconds, and no request is made while the
+    API rate limit is used up.
+    Args:
+        upc (str): The UPC code to search for.
+    Returns:
+        tuple: A tuple containing the product information, rate limit remaining, and reset time.
+    """
+    cached = _cached_info(upc)
+    if cached is not None:
+        return cached, '', ''
 
-        if upc_data['items']:
-            return upc_data['items'], rate_limit_remaining, rate_limit_reset
+    upc_data, rate_limit_remaining, rate_limit_reset = _request_info(upc)
+    if upc_data is None:
+        return False, rate_limit_remaining, rate_limit_reset
+
+    _cache_info(upc, upc_data)
+    if upc_data['items']:
+        return upc_data['items'], rate_limit_remaining, rate_limit_reset
+    else:
+        return False, rate_limit_remaining, rate_limit_reset
+
+
+def batch_fetch(upcs):
+    """
+    Fetches product information for several UPCs, sending the API requests concurrently.
+    UPCs that are already in the inventory are skipped, and cached UPCs are answered without a request.
+    Args:
+        upcs (list): The UPC codes to search for.
+    Returns:
+        dict: fetch_info() results keyed by UPC.
+    """
+    results = {}
+    to_request = []
+    for upc in dict.fromkeys(upcs):
+        if search_by_upc('inventory', upc, ('ID',)):
+            continue
+        cached = _cached_info(upc)
+        if cached is not None:
+            results[upc] = cached, '', ''
         else:
-            return False, rate_limit_remaining, rate_limit_reset
-    except requests.exceptions.HTTPError:
-        return False, '', ''
+            to_request.append(upc)
+
+    _get_session()  # Create the session before the workers share it
+    # Few workers keep the trial API's quota from being overrun by requests already in flight; queued lookups
+    # return early once a response reports the limit as used up
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        responses = pool.map(_request_info, to_request)
+        # Cache writes stay on this thread, which owns the database connection
+        for upc, (upc_data, rate_limit_remaining, rate_limit_reset) in zip(to_request, responses):
+            if upc_data is None:
+                results[upc] = False, rate_limit_remaining, rate_limit_reset
+                continue
+            _cache_info(upc, upc_data)
+            results[upc] = upc_data['items'] or False, rate_limit_remaining, rate_limit_reset
+
+    return results
+
+
+@functools.lru_cache(maxsize=16)
+def _format_reset(reset):
+    """
+    Formats the API rate limit reset time for display. Lookups within one rate limit window share the same
+    reset time, so the formatted string is cached.
+    Args:
+        reset (str): UNIX time of the reset, as sent in the X-RateLimit-Reset header.
+    Returns:
+        str: The reset time in UTC, or the header value unchanged if it is not a UNIX time.
+    """
+    if not reset.isdigit():
+        return reset
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(int(reset)))
+
+
+def _item_info(upc, fetched=None):
+    """
+    Finds the name, description and category of a UPC in the inventory, the API, or by asking the user.
+    Args:
+        upc (str): The UPC code to describe.
+        fetched (tuple, optional): A fetch_info() result for the UPC that was already retrieved.
+    Returns:
+        tuple: A tuple (item_name, description, category, upc) or None if the user decides to go back.
+    """
+    # Check inventory
+    inventory_item = search_by_upc('inventory', upc, ('name', 'description', 'category'))
+    if inventory_item:
+        item_name, description, category = inventory_item
+        print(f"Item '{item_name}' found in inventory.")
+        return item_name, description, category, upc
+
+    # Fetch information from the API
+    fetch, remaining, reset = fetched or fetch_info(upc)
+    if remaining and reset:
+        until = _format_reset(reset)
+        print(f"You have {remaining} search(es) remaining until {until}.")
+
+    if fetch:
+        product_info = fetch[0]
+        item_name = product_info.get('title', 'Unknown')
+        description = product_info.get('description', 'No description available')
+        category = product_info.get('category', 'Uncategorized')
+        print(f"Item '{item_name}' found via API.")
+        return item_name, description, category, upc
+
+    # Prompt user for item information if not found in API
+    item_name = input(f'{BColors.WARNING}Enter product name for {upc} (0 to go back): {BColors.END_C}')
+    if item_name == '0':
+        return None
+
+    description = input("Enter description: ")
+    category = input("Enter category: ")
+
+    return item_name, description, category, upc
 
 
 def get_item_info_by_upc():
@@ -248,71 +729,70 @@ def get_item_info_by_upc():
         if upc == '0':
             return None
 
-        # Check inventory
-        inventory_item = search_db('current', 'inventory', 'upc', upc)
-        if inventory_item:
-            item_name, description, category = inventory_item[0][1], inventory_item[0][4], inventory_item[0][6]
-            print(f"Item '{item_name}' found in inventory.")
-            return item_name, description, category, upc
-
-        # Fetch information from the API
-        fetch, remaining, reset = fetch_info(upc)
-        if remaining and reset:
-            until = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(int(reset)))
-            print(f"You have {remaining} search(es) remaining until {until}.")
-
-        if fetch:
-            product_info = fetch[0]
-            item_name = product_info.get('title', 'Unknown')
-            description = product_info.get('description', 'No description available')
-            category = product_info.get('category', 'Uncategorized')
-            print(f"Item '{item_name}' found via API.")
-            return item_name, description, category, upc
-
-        # Prompt user for item information if not found in API
-        item_name = input(f'{BColors.WARNING}Enter product name (0 to go back): {BColors.END_C}')
-        if item_name == '0':
-            continue
-
-        description = input("Enter description: ")
-        category = input("Enter category: ")
-
-        return item_name, description, category, upc
+        item_info = _item_info(upc)
+        if item_info:
+            return item_info
 
 
 def user_items_to_inventory():
     """
     Allows the user to add items to the inventory.
+    Quantity changes are saved as each item is scanned; new items are staged and inserted together when the user exits.
     """
     check_current_db()
 
+    pending = {}
+    # One timestamp for the whole batch; every new item shares it as time_first_added
+    now = int(time.time())
+    try:
+        _scan_items_to_inventory(pending, now)
+    finally:
+        # Staged items are saved even if scanning was interrupted
+        if pending:
+            with transaction('current') as db:
+                db.executemany(_UPSERT_INVENTORY, pending.values())
+            print(f'{len(pending)} new item(s) have been added to the inventory.')
+
+
+def _scan_items_to_inventory(pending, now):
+    """
+    Prompts for UPCs to add to the inventory until the user exits.
+    Args:
+        pending (dict): New items not yet in the database, keyed by UPC, as [name, upc, qty, description, time] rows.
+        now (int): Timestamp recorded as time_first_added for new items.
+    """
     while True:
         print('Add item: ')
         upc = input('Enter UPC (0 for exit): ')
         if upc == '0':
             return
+        if not upc.isdigit():
+            print(f'{BColors.WARNING}A UPC can only contain digits.{BColors.END_C}')
+            continue
+
+        # Check if item was already scanned this session
+        if upc in pending:
+            pending[upc][2] += 1
+            print(pending[upc][0] + ' | Current quantity: ' + str(pending[upc][2]))
+            continue
 
         # Check if item is in inventory
-        search = search_db('current', 'inventory', 'upc', upc)
+        search = search_by_upc('inventory', upc, ('ID', 'name', 'qty'))
         if search:
-            mod_qty_db('current', 'inventory', search[0][0], 1)
-            print(search[0][1] + ' | Current quantity: ' + str((search[0][3] + 1)))
+            item_id, item_name, qty = search
+            mod_qty_db('current', 'inventory', item_id, 1)
+            print(item_name + ' | Current quantity: ' + str((qty + 1)))
         else:
             fetch, remaining, reset = fetch_info(upc)
             if remaining and reset:
-                until = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(int(reset)))
+                until = _format_reset(reset)
                 print(f'You have {remaining} search(s) until {until}')
 
             if fetch:
                 print(fetch[0]['title'])
                 product_info = fetch[0]
-                new_item = {
-                    'name': product_info['title'],
-                    'upc': upc,
-                    'qty': 1,
-                    'description': product_info['description'],
-                    'time_first_added': int(time.time())
-                }
+                item_name = product_info['title']
+                description = product_info['description']
             else:
                 while True:
                     item_name = input(f'{BColors.WARNING}Enter product name (0 for exit): {BColors.END_C}')
@@ -326,16 +806,9 @@ def user_items_to_inventory():
                         break
 
                 description = input("Enter description: ")
-                new_item = {
-                    'name': item_name,
-                    'upc': upc,
-                    'qty': 1,
-                    'description': description,
-                    'time_first_added': int(time.time())
-                }
 
-            add_remove_db('current', 'inventory', add=True, **new_item)
-            print(f"Item '{new_item['name']}' has been added to the inventory. | Current quantity: 1")
+            pending[upc] = [item_name, upc, 1, description, now]
+            print(f"Item '{item_name}' will be added to the inventory. | Current quantity: 1")
 
 
 def user_items_from_inventory():
@@ -349,15 +822,19 @@ def user_items_from_inventory():
         upc = input('Enter UPC (0 for exit): ')
         if upc == '0':
             return
+        if not upc.isdigit():
+            print(f'{BColors.WARNING}A UPC can only contain digits.{BColors.END_C}')
+            continue
 
         # Check if item is in inventory
-        search = search_db('current', 'inventory', 'upc', upc)
+        search = search_by_upc('inventory', upc, ('ID', 'name', 'qty'))
         if search:
-            if search[0][3] > 0:
-                mod_qty_db('current', 'inventory', search[0][0], add=False)
-                print(search[0][1] + ' | Current quantity: ' + str((search[0][3] - 1)))
+            item_id, item_name, qty = search
+            if qty > 0:
+                mod_qty_db('current', 'inventory', item_id, add=False)
+                print(item_name + ' | Current quantity: ' + str((qty - 1)))
             else:
-                print(f'{BColors.WARNING}{search[0][1]} has 0 in inventory already.{BColors.END_C}')
+                print(f'{BColors.WARNING}{item_name} has 0 in inventory already.{BColors.END_C}')
         else:
             print(f'{BColors.WARNING}Item is not currently in inventory.{BColors.END_C}')
 
@@ -370,7 +847,7 @@ def add_default_shopping_list(list_name):
     """
     check_current_db()
 
-    if search_db('current', 'default_lists', 'name', list_name):
+    if search_by_name('default_lists', list_name, ('ID',)):
         print(f"The shopping list '{list_name}' already exists.")
         return
 
@@ -382,10 +859,67 @@ def add_default_shopping_list(list_name):
     print(f"Shopping list '{list_name}' has been added.")
 
 
+def add_item_to_default_list(list_id, item_info, now=None):
+    """
+    Adds an item to a default shopping list, or changes its quantity if it is already on the list.
+    Args:
+        list_id (int): ID of the default list.
+        item_info (tuple): A tuple (item_name, description, category, upc) as returned by get_item_info_by_upc.
+        now (int, optional): Timestamp recorded as time_first_added. Defaults to the current time.
+    """
+    item_name, description, category, upc = item_info
+
+    # Check if the item is already on the list
+    existing_item = find_list_item(list_id, upc)
+
+    if existing_item:
+        existing_id, existing_qty = existing_item
+        print(f"Item '{item_name}' is already on the list.")
+        try:
+            mod_qty = int(input("Enter quantity to modify: "))
+        except ValueError:
+            print("Invalid input.")
+            return
+
+        # Modify the quantity using the mod_qty_db function
+        mod_qty_db('current', 'default_lists_items',
+                   existing_id, mod=(mod_qty - existing_qty))
+        print(f"Item '{item_name}' quantity modified.")
+
+    else:
+        try:
+            qty = int(input("Enter quantity: "))
+        except ValueError:
+            print("Invalid input.")
+            return
+
+        new_item = {
+            'default_lists_id': list_id,
+            'name': item_name,
+            'upc': upc,
+            'qty': qty,
+            'description': description,
+            'time_first_added': now or int(time.time()),
+            'category': category
+        }
+        add_remove_db('current', 'default_lists_items', add=True, **new_item)
+        print(f"Item '{item_name}' added to shopping list.")
+
+
+# Accepted answers to the edit_default_shopping_list action prompt
+_ADD_ACTIONS = frozenset({'add', '1'})
+_BULK_ACTIONS = frozenset({'bulk'})
+_REMOVE_ACTIONS = frozenset({'remove'})
+_EXIT_ACTIONS = frozenset({'exit', '0'})
+_EDIT_ACTIONS = _ADD_ACTIONS | _BULK_ACTIONS | _REMOVE_ACTIONS
+
+
 def edit_default_shopping_list():
     """
     Edits an existing default shopping list by adding or removing items.
     """
+    check_current_db()
+
     shopping_lists = search_db('current', 'default_lists')
     if not shopping_lists:
         print("No default shopping lists found.")
@@ -404,61 +938,48 @@ def edit_default_shopping_list():
     if selection == 0:
         return
 
+    if not 1 <= selection <= len(shopping_lists):
+        print("Invalid selection.")
+        return
+
     list_id = shopping_lists[selection - 1][0]
 
     while True:
-        action = input("Enter 'add'(1) to add or change items, 'remove' to remove items, 'exit'(0) to finish: ").strip().lower()
-        if action == 'exit' or action == '0':
+        action = input("Enter 'add'(1) to add or change items, 'bulk' to add several UPCs at once, "
+                       "'remove' to remove items, 'exit'(0) to finish: ").strip().lower()
+        if action in _EXIT_ACTIONS:
             break
-        elif action not in ('add', 'remove', '1'):
+        elif action not in _EDIT_ACTIONS:
             print("Invalid action.")
             continue
 
+        # Each change is saved as soon as it is confirmed, so an interrupted session keeps earlier edits
+        now = int(time.time())
         while True:
-            if action == 'add' or action == '1':
+            if action in _ADD_ACTIONS:
                 item_info = get_item_info_by_upc()
                 if not item_info:
                     break
 
-                item_name, description, category, upc = item_info
+                add_item_to_default_list(list_id, item_info, now)
+
+            elif action in _BULK_ACTIONS:
+                # Collect every UPC first so the API lookups can run concurrently
+                upcs = []
+                while True:
+                    upc = input("Enter item UPC (blank line to finish): ").strip()
+                    if not upc:
+                        break
+                    upcs.append(upc)
 
-                # Check if the item is already on the list
-                existing_items = search_db('current', 'default_lists_items', 'upc', upc)
-                existing_item = next((item for item in existing_items if item[1] == list_id), None)
-
-                if existing_item:
-                    print(f"Item '{item_name}' is already on the list.")
-                    try:
-                        mod_qty = int(input("Enter quantity to modify: "))
-                    except ValueError:
-                        print("Invalid input.")
-                        continue
-
-                    # Modify the quantity using the mod_qty_db function
-                    mod_qty_db('current', 'default_lists_items',
-                               existing_item[0], mod=(mod_qty - existing_item[4]))
-                    print(f"Item '{item_name}' quantity modified.")
-
-                else:
-                    try:
-                        qty = int(input("Enter quantity: "))
-                    except ValueError:
-                        print("Invalid input.")
-                        continue
-
-                    new_item = {
-                        'default_lists_id': list_id,
-                        'name': item_name,
-                        'upc': upc,
-                        'qty': qty,
-                        'description': description,
-                        'time_first_added': int(time.time()),
-                        'category': category
-                    }
-                    add_remove_db('current', 'default_lists_items', add=True, **new_item)
-                    print(f"Item '{item_name}' added to shopping list.")
-
-            elif action == 'remove':
+                fetched = batch_fetch(upcs)
+                for upc in upcs:
+                    item_info = _item_info(upc, fetched.get(upc))
+                    if item_info:
+                        add_item_to_default_list(list_id, item_info, now)
+                break
+
+            elif action in _REMOVE_ACTIONS:
                 # Ask the user how they want to find the item
                 print("Choose how you want to find the item to remove:")
                 print("1. Select from a list")
@@ -470,33 +991,12 @@ def edit_default_shopping_list():
 
                     # Option 1: Select from a list
                     if method_choice == 1:
-                        # Fetch all items in the inventory
-                        items = search_db('current', 'default_lists_items',
-                                          'default_lists_id', list_id)
-
-                        if not items:
-                            print("The inventory is empty.")
-                            return
-
-                        # Display all items by name
-                        print("Select an item to remove:")
-                        for idx, item in enumerate(items, start=1):
-                            print(f"{idx}. {item[2]} ({item[3]})")  # Display the item name
-
-                        # Prompt the user to select an item to remove
-                        selection = int(input("Enter the number of the item to remove (0 to cancel): "))
-
-                        if selection == 0:
-                            print("Operation canceled.")
-                            return
-
-                        # Validate the selection
-                        if 1 <= selection <= len(items):
-                            item_id = items[selection - 1][0]  # Get the ID of the selected item
-                            item_name = items[selection - 1][2]  # Get the name of the selected item
-                        else:
-                            print("Invalid selection. Please select a valid item number.")
+                        selected = choose_item('default_lists_items', 'remove', ('ID', 'name'),
+                                               where='default_lists_id = ?', params=(list_id,),
+                                               empty_message='The shopping list is empty.')
+                        if not selected:
                             return
+                        item_id, item_name = selected
 
                     # Option 2: Enter a UPC
                     elif method_choice == 2:
@@ -504,13 +1004,12 @@ def edit_default_shopping_list():
                         upc = input("Enter the UPC of the item to remove: ")
 
                         # Check if item is in inventory
-                        search = search_db('current', 'default_lists_items', 'upc', upc)
+                        search = search_by_upc('default_lists_items', upc, ('ID', 'name'))
                         if not search:
                             print(f"Item with UPC {upc} not found in the inventory.")
                             return
 
-                        item_id = search[0][0]  # Get the ID of the selected item
-                        item_name = search[0][2]  # Get the name of the selected item
+                        item_id, item_name = search  # Get the ID and name of the selected item
 
                     elif method_choice == 0:
                         return
@@ -541,22 +1040,17 @@ def delete_default_shopping_list(list_name):
         list_name (str): The name of the shopping list to delete.
     """
     check_current_db()
-    shopping_list = search_db('current', 'default_lists', 'name', list_name)
+    shopping_list = search_by_name('default_lists', list_name, ('ID',))
 
     if not shopping_list:
         print(f"The shopping list '{list_name}' does not exist.")
         return
 
-    list_id = shopping_list[0][0]
+    list_id, = shopping_list
+    # Items in default_lists_items are removed by the foreign key's ON DELETE CASCADE
     add_remove_db('current', 'default_lists', add=False, id=list_id)
     print(f"Shopping list '{list_name}' has been deleted.")
-
-    # Clean up related items in default_lists_items
-    with sqlite3.connect(f'./.data/current.db') as db:
-        cur = db.cursor()
-        cur.execute('DELETE FROM default_lists_items WHERE default_lists_id = ?', (list_id,))
-        db.commit()
-        print(f"Items associated with '{list_name}' have been deleted.")
+    print(f"Items associated with '{list_name}' have been deleted.")
 
 
 def remove_item_permanently():
@@ -577,32 +1071,10 @@ def remove_item_permanently():
 
         # Option 1: Select from a list
         if method_choice == 1:
-            # Fetch all items in the inventory
-            items = search_db('current', 'inventory')
-
-            if not items:
-                print("The inventory is empty.")
-                return
-
-            # Display all items by name
-            print("Select an item to remove:")
-            for idx, item in enumerate(items, start=1):
-                print(f"{idx}. {item[1]} ({item[2]})")  # Display the item name
-
-            # Prompt the user to select an item to remove
-            selection = int(input("Enter the number of the item to remove (0 to cancel): "))
-
-            if selection == 0:
-                print("Operation canceled.")
-                return
-
-            # Validate the selection
-            if 1 <= selection <= len(items):
-                item_id = items[selection - 1][0]  # Get the ID of the selected item
-                item_name = items[selection - 1][1]  # Get the name of the selected item
-            else:
-                print("Invalid selection. Please select a valid item number.")
+            selected = choose_item('inventory', 'remove', ('ID', 'name'))
+            if not selected:
                 return
+            item_id, item_name = selected
 
         # Option 2: Enter a UPC
         elif method_choice == 2:
@@ -610,13 +1082,12 @@ def remove_item_permanently():
             upc = input("Enter the UPC of the item to remove: ")
 
             # Check if item is in inventory
-            search = search_db('current', 'inventory', 'upc', upc)
+            search = search_by_upc('inventory', upc, ('ID', 'name'))
             if not search:
                 print(f"Item with UPC {upc} not found in the inventory.")
                 return
 
-            item_id = search[0][0]  # Get the ID of the selected item
-            item_name = search[0][1]  # Get the name of the selected item
+            item_id, item_name = search  # Get the ID and name of the selected item
 
         else:
             print("Invalid choice. Please select 1 or 2.")
@@ -653,33 +1124,10 @@ def manual_qty_adjust():
 
         # Option 1: Select from a list
         if method_choice == 1:
-            # Fetch all items in the inventory
-            items = search_db('current', 'inventory')
-
-            if not items:
-                print("The inventory is empty.")
-                return
-
-            # Display all items by name
-            print("Select an item to change:")
-            for idx, item in enumerate(items, start=1):
-                print(f"{idx}. {item[1]} ({item[2]})")  # Display the item name
-
-            # Prompt the user to select an item to remove
-            selection = int(input("Enter the number of the item to change (0 to cancel): "))
-
-            if selection == 0:
-                print("Operation canceled.")
-                return
-
-            # Validate the selection
-            if 1 <= selection <= len(items):
-                item_id = items[selection - 1][0]  # Get the ID of the selected item
-                item_name = items[selection - 1][1]  # Get the name of the selected item
-                current_qty = items[selection - 1][3] # Get the qty of the selected item
-            else:
-                print("Invalid selection. Please select a valid item number.")
+            selected = choose_item('inventory', 'change', ('ID', 'name', 'qty'))
+            if not selected:
                 return
+            item_id, item_name, current_qty = selected
 
         # Option 2: Enter a UPC
         elif method_choice == 2:
@@ -687,14 +1135,12 @@ def manual_qty_adjust():
             upc = input("Enter the UPC of the item to change: ")
 
             # Check if item is in inventory
-            search = search_db('current', 'inventory', 'upc', upc)
+            search = search_by_upc('inventory', upc, ('ID', 'name', 'qty'))
             if not search:
                 print(f"Item with UPC {upc} not found in the inventory.")
                 return
 
-            item_id = search[0][0]  # Get the ID of the selected item
-            item_name = search[0][1]  # Get the name of the selected item
-            current_qty = search[0][3] # Get the qty of the selected item
+            item_id, item_name, current_qty = search  # Get the ID, name and qty of the selected item
 
         else:
             print("Invalid choice. Please select 1 or 2.")
@@ -731,33 +1177,10 @@ def edit_inventory_item():
 
         # Option 1: Select from a list
         if method_choice == 1:
-            # Fetch all items in the inventory
-            items = search_db('current', 'inventory')
-
-            if not items:
-                print("The inventory is empty.")
-                return
-
-            # Display all items by name
-            print("Select an item to edit:")
-            for idx, item in enumerate(items, start=1):
-                print(f"{idx}. {item[1]} ({item[2]})")  # Display the item name and description
-
-            # Prompt the user to select an item to edit
-            selection = int(input("Enter the number of the item to edit (0 to cancel): "))
-
-            if selection == 0:
-                print("Operation canceled.")
-                return
-
-            # Validate the selection
-            if 1 <= selection <= len(items):
-                item_id = items[selection - 1][0]  # Get the ID of the selected item
-                current_name = items[selection - 1][1]  # Current name of the selected item
-                current_description = items[selection - 1][4]  # Current description
-            else:
-                print("Invalid selection. Please select a valid item number.")
+            selected = choose_item('inventory', 'edit', ('ID', 'name', 'description'))
+            if not selected:
                 return
+            item_id, current_name, current_description = selected
 
         # Option 2: Enter a UPC
         elif method_choice == 2:
@@ -765,14 +1188,12 @@ def edit_inventory_item():
             upc = input("Enter the UPC of the item to edit: ")
 
             # Check if item is in inventory
-            search = search_db('current', 'inventory', 'upc', upc)
+            search = search_by_upc('inventory', upc, ('ID', 'name', 'description'))
             if not search:
                 print(f"Item with UPC {upc} not found in the inventory.")
                 return
 
-            item_id = search[0][0]  # Get the ID of the selected item
-            current_name = search[0][1]  # Current name of the selected item
-            current_description = search[0][4]  # Current description
+            item_id, current_name, current_description = search  # Current values of the selected item
 
         else:
             print("Invalid choice. Please select 1 or 2.")
@@ -795,11 +1216,10 @@ def edit_inventory_item():
             new_description = current_description  # Keep the current description if the user doesn't enter a new one
 
         # Update the item in the database
-        with sqlite3.connect(f'./.data/current.db') as db:
-            cur = db.cursor()
-            cur.execute('UPDATE inventory SET name = ?, description = ? WHERE ID = ?', (new_name, new_description, item_id))
-            db.commit()
-            print(f"Item '{current_name}' has been updated to '{new_name}' with the new description.")
+        with transaction('current') as db:
+            db.execute('UPDATE inventory SET name = ?, description = ? WHERE ID = ?',
+                       (new_name, new_description, item_id))
+        print(f"Item '{current_name}' has been updated to '{new_name}' with the new description.")
 
     except ValueError:
         print("Invalid input. Please enter a valid number.")
@@ -815,20 +1235,20 @@ def compare_default_list_to_inventory(default_list_id):
     """
     check_current_db()
 
-    default_list_items = search_db('current', 'default_lists_items', 'default_lists_id',
-                                   default_list_id, sort_by='name', sort_desc=False)
-    if not default_list_items:
+    # Look up each list item's inventory qty by name (idx_inventory_name) instead of loading the whole inventory
+    query = '''
+        SELECT dli.name, dli.qty,
+               COALESCE((SELECT inv.qty FROM inventory inv WHERE inv.name = dli.name ORDER BY inv.ID DESC LIMIT 1), 0)
+        FROM default_lists_items dli
+        WHERE dli.default_lists_id = ? ORDER BY dli.name
+    '''
+    rows = get_connection('current').execute(query, (default_list_id,)).fetchall()
+    if not rows:
         print(f"No items found on list searched.")
         return []
 
-    inventory_items = search_db('current', 'inventory', sort_by='name', sort_desc=False)
-    inventory_dict = {item[1]: item for item in inventory_items}
-
     items_to_add = []
-    for item in default_list_items:
-        default_name, default_qty = item[2], item[4]
-        inventory_qty = inventory_dict.get(default_name, (None, None, None, 0))[3]
-
+    for default_name, default_qty, inventory_qty in rows:
         if inventory_qty < default_qty:
             items_to_add.append((default_name, default_qty - inventory_qty))
 
@@ -861,13 +1281,16 @@ def create_shopping_list():
     if selection == 0:
         return []
 
+    if not 1 <= selection <= len(shopping_lists):
+        print("Invalid selection.")
+        return []
+
     selected_list_id = shopping_lists[selection - 1][0]
     items_needed = compare_default_list_to_inventory(selected_list_id)
-    print(f"Initial items needed: {items_needed}")
+    log.debug("Initial items needed: %s", items_needed)
 
     additional_items = []
     while True:
-        print('here')
         action = input('Would you like to manually add more items? yes(1) no(0)'
                        ' or "hand" for handwritten items. "c" to cancel : ').strip().lower()
         if action == 'no' or action == '0':
@@ -897,21 +1320,54 @@ def create_shopping_list():
                     continue
 
 
-    additional_items_to_add = []
-    for item_name, qty in additional_items:
-        inventory_qty = search_db('current', 'inventory', 'name', item_name)
-        if inventory_qty:
-            inventory_qty = inventory_qty[0][3]
-        else:
-            inventory_qty = 0
-        if inventory_qty < qty:
-            additional_items_to_add.append((item_name, qty - inventory_qty))
+    # Look up every additional item's inventory qty in a single query
+    names = list({item_name for item_name, qty in additional_items})
+    inventory_qty = {}
+    if names:
+        # For duplicate names the oldest item (lowest ID) is read last, so it wins in the dict,
+        # as the per-name search did
+        query = f"SELECT name, qty FROM inventory WHERE name IN ({','.join('?' * len(names))}) ORDER BY ID DESC"
+        inventory_qty = dict(get_connection('current').execute(query, names))
+
+    additional_items_to_add = [(item_name, qty - inventory_qty.get(item_name, 0))
+                               for item_name, qty in additional_items if inventory_qty.get(item_name, 0) < qty]
 
     combined_items_needed = items_needed + additional_items_to_add
-    print(f"Final list of items needed: {combined_items_needed}\n")
+    log.debug("Final list of items needed: %s", combined_items_needed)
     return combined_items_needed
 
 
+# USB printer of the running print job; the printing helpers write to p, which buffers a receipt in memory
+_usb = None
+
+
+def _new_receipt():
+    """
+    Creates the in-memory printer that collects the ESC/POS commands of one receipt.
+    Returns:
+        printer.Dummy: Printer that buffers its output.
+    """
+    from escpos import printer
+
+    return printer.Dummy(profile=printer_config['profile'])
+
+
+def send_receipt(cut=True):
+    """
+    Sends the buffered receipt to the printer in a single write and starts a new one.
+    Args:
+        cut (bool, optional): Whether to cut the paper after the receipt. Defaults to True.
+    MUST BE RUN INSIDE A FUNCTION WRAPPED WITH USE_PRINTER
+    """
+    global p
+    if cut:
+        p.cut()
+    output = p.output
+    if output:
+        _usb._raw(output)  # noqa
+    p = _new_receipt()
+
+
 def use_printer(func):
     """
     Decorator to start and stop the printer connection each time it is used
@@ -919,14 +1375,18 @@ def use_printer(func):
     :return: Return from func
     """
     def wrapper(*args, **kwargs):
+        from escpos import exceptions
+
         try:
             # Initialize the printer connection
-            global p
-            p = printer_connect(read_config())
+            global p, _usb
+            _usb = printer_connect(printer_config)
+            p = _new_receipt()
             # Run the wrapped function
             result = func(*args, **kwargs)
-            # Cut and finalize printing after function execution
-            p.close()
+            # Send anything printed after the last receipt and finalize printing
+            send_receipt(cut=False)
+            _usb.close()
             return result
         except exceptions.USBNotFoundError:
             print(f"{BColors.WARNING}Printer not connected!{BColors.END_C}")
@@ -935,6 +1395,88 @@ def use_printer(func):
     return wrapper
 
 
+# ESC/POS command fragments used to build PDF417 barcodes
+_ALIGN_CENTER = b'\x1b\x61\x01'
+_PDF417_PREFIX = b'\x1d\x28\x6b\x03\x00\x30'  # GS ( k with pl and ph for one byte settings
+_PDF417_PREFIX_SHORT = b'\x1d\x28\x6b'  # GS ( k without pl and ph
+_PDF417_EC_PREFIX = _PDF417_PREFIX_SHORT + b'\x04\x00\x30\x45\x31'
+_PDF417_STORE = b'\x30\x50\x30'
+_PDF417_PRINT = _PDF417_PREFIX + b'\x51\x30'
+# Every setting command with its function code baked in; only the setting values are filled in per barcode
+_PDF417_SETUP = (
+    _ALIGN_CENTER
+    + _PDF417_PREFIX + b'F%c'  # Select model: standard or truncated
+    + _PDF417_PREFIX + b'A%c'  # Column count
+    + _PDF417_PREFIX + b'B%c'  # Rows count
+    + _PDF417_PREFIX + b'C%c'  # Set dot sizes
+    + _PDF417_PREFIX + b'D%c'  # Height multiplier
+    + _PDF417_EC_PREFIX + b'%c'  # Set error correction ratio
+)
+
+
+# Allowed values and error message for each print_pdf417 setting, in the order they are checked
+_PDF417_LIMITS = (
+    (range(2, 9), 'Width must be between 2 and 8'),
+    (frozenset({0}) | frozenset(range(3, 91)), 'Rows must be 0 (auto) or between 3 and 90'),
+    (range(0, 17), 'Height multiplier must be between 0 and 16'),
+    (range(0, 31), 'Data column count must be between 0 and 30'),
+    (range(1, 41), 'Error correction level must be between 1 and 40'),
+    (range(0, 2), 'Options must be 0 (standard) or 1 (truncated)'),
+)
+
+
+@functools.lru_cache(maxsize=32, typed=True)
+def _pdf417_setup(width, rows, height_multiplier, data_column_count, ec, options):
+    """
+    Validates the PDF417 settings and builds their command sequence, once per distinct combination.
+    Args:
+        width (int): Module width.
+        rows (int): Number of rows.
+        height_multiplier (int): Height multiplier.
+        data_column_count (int): Data column count.
+        ec (int): Error correction level.
+        options (int): Barcode options (0 = standard, 1 = truncated).
+    Returns:
+        tuple: (setup bytes, None) if the settings are valid, else (None, error message).
+    """
+    settings = (width, rows, height_multiplier, data_column_count, ec, options)
+    for value, (allowed, error) in zip(settings, _PDF417_LIMITS):
+        if value not in allowed:
+            return None, error
+    return _PDF417_SETUP % (options, data_column_count, rows, width, height_multiplier, ec), None
+
+
+def _encode_pdf417(content, width, rows, height_multiplier, data_column_count, ec, options):
+    """
+    Builds the complete PDF417 command sequence from the cached settings and the barcode content.
+    Args:
+        content (str): Content to encode in the barcode.
+        width (int): Module width.
+        rows (int): Number of rows.
+        height_multiplier (int): Height multiplier.
+        data_column_count (int): Data column count.
+        ec (int): Error correction level.
+        options (int): Barcode options (0 = standard, 1 = truncated).
+    Returns:
+        tuple: (command bytes, None) if the barcode can be printed, else (None, error message).
+    """
+    if len(content) + 3 >= 500:
+        return None, 'TOO LARGE'
+    setup, error = _pdf417_setup(width, rows, height_multiplier, data_column_count, ec, options)
+    if error:
+        return None, error
+
+    content = content.encode('utf-8')
+
+    chunks = [
+        setup,
+        # Save in symbol storage area (pl and ph are the length as a little-endian uint16, including 3 additional bytes)
+        _PDF417_PREFIX_SHORT, struct.pack('<H', len(content) + 3), _PDF417_STORE, content,
+        _PDF417_PRINT  # Print from symbol storage area
+    ]
+    return b''.join(chunks), None
+
+
 def print_pdf417(content, width=2, rows=0, height_multiplier=0, data_column_count=0, ec=20, options=0):
     """
     Generate and send a PDF417 barcode command sequence to the printer.
@@ -950,103 +1492,16 @@ def print_pdf417(content, width=2, rows=0, height_multiplier=0, data_column_coun
         str: Error message if any issue, else None.
     MUST BE RUN INSIDE A FUNCTION WRAPPED WITH USE_PRINTER
     """
-
-    def validate_parameters():
-        if len(content) + 3 >= 500:
-            return 'TOO LARGE'
-        if not 2 <= width <= 8:
-            return 'Width must be between 2 and 8'
-        if rows != 0 and not 3 <= rows <= 90:
-            return "Rows must be 0 (auto) or between 3 and 90"
-        if not 0 <= height_multiplier <= 16:
-            return 'Height multiplier must be between 0 and 16'
-        if not 0 <= data_column_count <= 30:
-            return 'Data column count must be between 0 and 30'
-        if not 1 <= ec <= 40:
-            return 'Error correction level must be between 1 and 40'
-        if options not in [0, 1]:
-            return 'Options must be 0 (standard) or 1 (truncated)'
-        return None
-
-    error = validate_parameters()
+    command, error = _encode_pdf417(content, width, rows, height_multiplier, data_column_count, ec, options)
     if error:
         return error
 
-    content = content.encode('utf-8')
+    # Sends the sequence to the printer
+    p._raw(command)  # noqa
 
-    def prefix():
-        # Create a byte array for the prefix command sequence (includes pl and ph for one byte settings)
-        trunk = bytearray(b'\x1d\x28\x6b\x03\x00\x30')
-        return trunk
-
-    def prefix_short():
-        # Create a shorter byte array for prefix (without pl and ph)
-        trunk = bytearray(b'\x1d\x28\x6b')
-        return trunk
-
-    def calculate_pl_ph(measure):
-        # Calculate pl and ph based on the length of the content
-        total_length = len(measure) + 3  # Length includes 3 additional bytes
-        pl = total_length % 256  # Lower byte
-        ph = total_length // 256  # Higher byte
-        if not ph:
-            ph = 0
-        pl_ph = pl, ph
-        bytearray(pl_ph)
-        return pl_ph
-
-    # Start creating the command sequence
-    # Select alignment mode centered
-    data = bytearray(b'\x1b\x61\x01')
-    # Select model: standard or truncated
-    data.extend(prefix())
-    code_byte = 70
-    data.extend(code_byte.to_bytes())
-    data.extend(options.to_bytes())
-
-    # Column count
-    data.extend(prefix())
-    code_byte = 65
-    data.extend(code_byte.to_bytes())
-    data.extend(data_column_count.to_bytes())
-
-    # Rows count
-    data.extend(prefix())
-    code_byte = 66
-    data.extend(code_byte.to_bytes())
-    data.extend(rows.to_bytes())
-
-    # Set dot sizes
-    data.extend(prefix())
-    code_byte = 67
-    data.extend(code_byte.to_bytes())
-    data.extend(width.to_bytes())
-    data.extend(prefix())
-    code_byte = 68
-    data.extend(code_byte.to_bytes())
-    data.extend(height_multiplier.to_bytes())
-
-    # Set error correction ratio
-    data.extend(prefix_short())
-    data.extend(bytearray(b'\x04\x00\x30'))
-    code_byte = 69
-    data.extend(code_byte.to_bytes())
-    code_byte = 49
-    data.extend(code_byte.to_bytes())
-    data.extend(ec.to_bytes())
-
-    # Save is symbol storage area & print from symbol storage area
-    data.extend(prefix_short())
-    data.extend(calculate_pl_ph(content))  # Calculate and add pl and ph
-    data.extend(bytearray(b'\x30\x50\x30'))
-    data.extend(content)  # Add the barcode content
-    data.extend(prefix())
-    code_byte = 81
-    data.extend(code_byte.to_bytes())
-    data.extend(bytearray(b'\x30'))  # End of sequence generation
 
-    # Sends the sequence to the printer
-    p._raw(data)  # noqa
+# Receipt timestamp line, always in UTC
+_HEADER_TIME_FORMAT = 'Printed at: %m/%d/%Y %H:%M:%S UTC'
 
 
 def print_header():
@@ -1058,8 +1513,7 @@ def print_header():
     p.image('./assets/logo.png', center=True)
     p.hw('INIT')
     p.ln(2)
-    now = datetime.now(timezone.utc).strftime('%m/%d/%Y %H:%M:%S %Z')
-    p.text(f'Printed at: {now}')
+    p.text(time.strftime(_HEADER_TIME_FORMAT, time.gmtime()))
 
 
 def print_line():
@@ -1067,33 +1521,24 @@ def print_line():
     Prints a horizontal line across the width of the printer.
     MUST BE RUN INSIDE A FUNCTION WRAPPED WITH USE_PRINTER
     """
-    line = '-' * int(printer_config['chr_width'])
-    p.text(line)
+    p.text(LINE)
 
 
-def r_l_justify(str_a, str_b, space_chr=' '):
+def format_r_l(str_a, str_b, width, space_chr=' '):
     """
-    Prints two strings where one is justified to the left and one to the right.
+    Formats two strings where one is justified to the left and one to the right.
     Args:
         str_a (str): Left-justified string.
         str_b (str): Right-justified string.
+        width (int): Width of the line in characters.
         space_chr (str, optional): Character to use for spacing. Defaults to 'space'.
-    MUST BE RUN INSIDE A FUNCTION WRAPPED WITH USE_PRINTER
+    Returns:
+        str: The formatted line.
     """
-    if not space_chr or len(space_chr) != 1:
-        p.text('SPACE_CHR must be a single character')
-        return
-
-    both_length = len(str_a) + len(str_b)
-    if both_length > int(printer_config['chr_width']):
-        amt_to_trim = int(printer_config['chr_width']) - (len(str_b) + 5)
-        str_a = str_a[:amt_to_trim] + '...'
-        both_length = len(str_a) + len(str_b)
-
-    spaces = space_chr * (int(printer_config['chr_width']) - both_length)
-    final_str = f"{str_a}{spaces}{str_b}"
-    p.hw('INIT')
-    p.text(final_str)
+    room = width - len(str_b)
+    if len(str_a) > room:
+        str_a = str_a[:room - 5] + '...'
+    return str_a.ljust(room, space_chr) + str_b
 
 
 def print_list(items, list_uuid=None, barcode=True):
@@ -1108,10 +1553,14 @@ def print_list(items, list_uuid=None, barcode=True):
     MUST BE RUN INSIDE A FUNCTION WRAPPED WITH USE_PRINTER
     """
     list_uuid = list_uuid or str(uuid.uuid4())
-    creation_time = int(time.time())
+    creation_time = time.time_ns() // 1_000_000_000
 
-    for item_name, qty in items:
-        r_l_justify(str(item_name), str(qty))
+    # Clears the title formatting; callers rely on this instead of sending their own INIT
+    p.hw('INIT')
+    # Each line fills CHR_WIDTH exactly, so the printer wraps without separators
+    lines = [format_r_l(str(item_name), str(qty), CHR_WIDTH) for item_name, qty in items]
+    if lines:
+        p.text(''.join(lines))
     p.ln(1)
 
     if barcode:
@@ -1120,18 +1569,26 @@ def print_list(items, list_uuid=None, barcode=True):
     return {'time_generated': creation_time, 'uuid': list_uuid}, items
 
 
+def fetch_inventory_report_rows():
+    """
+    Reads the inventory for the inventory report.
+    Returns:
+        list: List of tuples (name, qty), sorted by name.
+    """
+    return get_connection('current').execute('SELECT name, qty FROM inventory ORDER BY name').fetchall()
+
+
 @use_printer
 def inventory_report():
     """
     Generates and prints the inventory report.
     """
-    items = [(item[1], item[3]) for item in search_db('current', 'inventory',
-                                                      sort_by='name', sort_desc=False)]
-    items_w_qty = [item for item in items if item[1] != 0]
+    # Read once; both print options reuse the rows shown here
+    rows = fetch_inventory_report_rows()
 
     # Shows user the inventory
     print(BColors.HEADER + 'Inventory' + BColors.END_C)
-    for name, qty in items:
+    for name, qty in rows:
         print(name + ', ' + str(qty))
 
     # Asks user if they would like to print
@@ -1149,9 +1606,8 @@ def inventory_report():
         p.set(double_height=True, double_width=True, align='center')
         p.text('Inventory Report')
         p.ln(2)
-        p.hw('INIT')
-        print_list(items, barcode=False)
-        p.cut()
+        print_list(rows, barcode=False)
+        send_receipt()
 
     elif choice == '2':
         print_header()
@@ -1159,9 +1615,8 @@ def inventory_report():
         p.set(double_height=True, double_width=True, align='center')
         p.text('Inventory Report')
         p.ln(2)
-        p.hw('INIT')
-        print_list(items_w_qty, barcode=False)
-        p.cut()
+        print_list([(name, qty) for name, qty in rows if qty != 0], barcode=False)
+        send_receipt()
 
     else:
         print('Invalid choice. Please select a valid option.')
@@ -1184,26 +1639,22 @@ def print_shopping_list(items):
     p.set(double_height=True, double_width=True, align='center')
     p.text('Shopping list')
     p.ln(2)
-    p.hw('INIT')
 
     output, items = print_list(items)
     creation_time, list_uuid = output['time_generated'], str(output['uuid'])
-    p.cut()
+    send_receipt()
 
-    add_remove_db('history', 'lists', add=True, UUID=list_uuid, creation_time=creation_time)
+    # Record the list and all of its items in one transaction
+    try:
+        with transaction('history') as db:
+            db.execute(_INSERT_LIST, (list_uuid, creation_time))
+            db.executemany(_INSERT_LIST_ITEM, [(list_uuid, item_name, qty) for item_name, qty in items])
+    except sqlite3.Error as e:
+        print(f"Error adding list '{list_uuid}' to history database: {e}")
 
-    for item_name, qty in items:
-        try:
-            add_remove_db(
-                database='history',
-                db_table='lists_items',
-                add=True,
-                default_lists_id=list_uuid,
-                name=item_name,
-                qty=qty
-            )
-        except Exception as e:
-            print(f"Error adding item '{item_name}' to history database: {e}")
+
+# Regular expression pattern to match a UUID format
+_UUID_PATTERN = re.compile(r'^[a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{12}$')
 
 
 @use_printer
@@ -1216,27 +1667,13 @@ def print_historical_list():
     # Prompt user for input (UUID or date)
     search_input = input("Enter the date (YYYY-MM-DD) or UUID to search for historical lists: ").strip()
 
-    # Regular expression pattern to match a UUID format
-    uuid_pattern = re.compile(r'^[a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{12}$')
-
-    # Initialize variables for the search
-    lists = [] # noqa
-
     # Determine if input is a UUID or a date
     uuid_to_search = None
-    if uuid_pattern.match(search_input):
+    if _UUID_PATTERN.match(search_input):
         # Input is a UUID
         uuid_to_search = search_input
-
-        # Query the database by UUID
-        with sqlite3.connect('./.data/history.db') as db:
-            cur = db.cursor()
-            query = '''
-                SELECT UUID, creation_time FROM lists
-                WHERE UUID = ?
-            '''
-            cur.execute(query, (uuid_to_search,))
-            lists = cur.fetchall()
+        predicate = 'l.UUID = ?'
+        params = (uuid_to_search,)
 
     else:
         # Input is not a UUID, try to parse as a date
@@ -1245,51 +1682,41 @@ def print_historical_list():
             date_start = datetime.strptime(search_input, "%Y-%m-%d")
             unix_start = int(date_start.replace(tzinfo=timezone.utc).timestamp())
             unix_end = unix_start + 86400  # Adds one day worth of seconds (86400) to get the end of the day
-
-            # Query the database by date range
-            with sqlite3.connect('./.data/history.db') as db:
-                cur = db.cursor()
-                query = '''
-                    SELECT UUID, creation_time FROM lists
-                    WHERE creation_time BETWEEN ? AND ? ORDER BY creation_time DESC
-                '''
-                cur.execute(query, (unix_start, unix_end))
-                lists = cur.fetchall()
+            predicate = 'l.creation_time BETWEEN ? AND ?'
+            params = (unix_start, unix_end)
 
         except ValueError:
             # If parsing as a date fails, it's an invalid input
             print("Invalid input. Please enter a valid UUID or date in YYYY-MM-DD format.")
             return
 
-    if not lists:
-        print("No historical lists found for the specified input.")
-        return
+    # Stream the matching lists and all of their items from one query, grouped by list
+    query = f'''
+        SELECT l.UUID, l.creation_time, li.name, li.qty FROM lists l
+        LEFT JOIN lists_items li ON li.default_lists_id = l.UUID
+        WHERE {predicate} ORDER BY l.creation_time DESC, li.ID
+    '''
+    rows = get_connection('history').execute(query, params)
+    found = False
+
+    for (list_uuid, creation_time), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        found = True
+        # A list without items still gets one row of NULLs from the LEFT JOIN
+        items = [(name, qty) for _, _, name, qty in group if name is not None]
 
-    # For each list, fetch the items and print the list
-    for list_uuid, creation_time in lists:
         # Convert creation_time to a formatted date string
         created_date = time.strftime('%Y-%m-%d %H:%M:%S (UTC)', time.gmtime(creation_time))
 
-        # Retrieve the items for this list
-        with sqlite3.connect('./.data/history.db') as db:
-            cur = db.cursor()
-            query = '''
-                SELECT name, qty FROM lists_items
-                WHERE default_lists_id = ?
-            '''
-            cur.execute(query, (list_uuid,))
-            items = cur.fetchall()
-
         print(uuid_to_search)
 
-        if not uuid_to_search: # noqa Skips if a list was searched by UUID
+        if not uuid_to_search:  # Skips if a list was searched by UUID
             # Give user option to print
             print('List from: ' + created_date)
             action = input('Print no(1), yes(2), or exit(0): ')
         else:
             action = None
 
-        if action == 'yes' or action == '2' or uuid_to_search: # noqa
+        if action == 'yes' or action == '2' or uuid_to_search:
             # Print the historical list using the prepared format
             print_header()
             p.ln(2)
@@ -1299,9 +1726,8 @@ def print_historical_list():
             p.set(double_height=True, double_width=True, align='center', invert=False)
             p.text('Shopping List')
             p.ln(2)
-            p.hw('INIT')
             print_list(items, list_uuid=list_uuid)
-            p.cut()
+            send_receipt()
 
         elif action == 'exit' or action == '0':
             break
@@ -1312,6 +1738,8 @@ def print_historical_list():
         else:
             print('Invalid choice. Please select a valid option.')
 
+    if not found:
+        print("No historical lists found for the specified input.")
 
 
 @use_printer
@@ -1327,179 +1755,197 @@ def print_all_default_lists():
     # This will store the final result
     all_lists_with_items = []
 
-    # Connect to the 'current.db' database
-    with sqlite3.connect('./.data/current.db') as db:
-        cur = db.cursor()
+    # Stream every list with its items in one query; a list without items gets a single row of NULLs
+    rows = get_connection('current').execute('''
+        SELECT dl.ID, dl.name, dli.name, dli.qty
+        FROM default_lists dl LEFT JOIN default_lists_items dli ON dli.default_lists_id = dl.ID
+        ORDER BY dl.ID, dli.name
+    ''')
 
-        # First, fetch all default lists
-        cur.execute('SELECT ID, name FROM default_lists')
-        default_lists = cur.fetchall()
-
-        # For each default list, fetch the associated items
-        for list_id, list_name in default_lists:
-            # Retrieve all items for this list
-            cur.execute('''
-                SELECT name, qty
-                FROM default_lists_items
-                WHERE default_lists_id = ? ORDER BY name
-            ''', (list_id,))
-            items = cur.fetchall()  # This will be a list of tuples (item_name, quantity)
-
-            # Append the list name and its items to the final result
-            all_lists_with_items.append((list_name, items))
-
-            # Shows user the list
-            print(BColors.HEADER + list_name + BColors.END_C)
-            for name, qty in items:
-                print(name + ', ' + str(qty))
-
-            # Ask use if they want to print the list
-            print('\n1. Print')
-            print('2. Continue')
-            print('0. Exit')
-            choice = input('Enter your choice: ')
-
-            if choice == '0':
-                break
+    for (list_id, list_name), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        items = [(name, qty) for _, _, name, qty in group if name is not None]
 
-            elif choice == '1':
-                # Prints list
-                print_header()
-                p.ln(2)
-                p.set(double_height=True, double_width=True, align='center', invert=True)
-                p.text(f'DEFAULT LIST')
-                p.ln(2)
-                p.set(double_height=True, double_width=True, align='center', invert=False)
-                p.text(list_name)
-                p.ln(2)
-                p.hw('INIT')
-                print_list(items, barcode=False)
-                p.cut()
-
-            elif choice == '2':
-                pass
+        # Append the list name and its items to the final result
+        all_lists_with_items.append((list_name, items))
 
-            else:
-                print('Invalid choice. Please select a valid option.')
+        # Shows user the list
+        print(BColors.HEADER + list_name + BColors.END_C)
+        for name, qty in items:
+            print(name + ', ' + str(qty))
+
+        # Ask use if they want to print the list
+        print('\n1. Print')
+        print('2. Continue')
+        print('0. Exit')
+        choice = input('Enter your choice: ')
+
+        if choice == '0':
+            break
+
+        elif choice == '1':
+            # Prints list
+            print_header()
+            p.ln(2)
+            p.set(double_height=True, double_width=True, align='center', invert=True)
+            p.text(f'DEFAULT LIST')
+            p.ln(2)
+            p.set(double_height=True, double_width=True, align='center', invert=False)
+            p.text(list_name)
+            p.ln(2)
+            print_list(items, barcode=False)
+            send_receipt()
+
+        elif choice == '2':
+            pass
+
+        else:
+            print('Invalid choice. Please select a valid option.')
 
     return all_lists_with_items
 
 
+# Each menu's text, printed in one call, and its choices mapped to the functions that handle them;
+# '0' is handled by each menu loop
+_REPORTS_MENU = (
+    f"{BColors.HEADER}Reports{BColors.END_C}\n"
+    '1. Inventory Report\n'
+    '2. Default Lists Report\n'
+    '0. Return to Main Menu'
+)
+_REPORT_ACTIONS = {
+    '1': inventory_report,
+    '2': print_all_default_lists,
+}
+
+
 def reports_menu():
     """
     Displays the reports menu and handles user choices.
     """
     while True:
-        print(f"{BColors.HEADER}Reports{BColors.END_C}")
-        print('1. Inventory Report')
-        print('2. Default Lists Report')
-        print('0. Return to Main Menu')
+        print(_REPORTS_MENU)
 
         choice = input('Enter your choice: ')
 
         if choice == '0':
             break
-        elif choice == '1':
-            inventory_report()
-        elif choice == '2':
-            print_all_default_lists()
+        action = _REPORT_ACTIONS.get(choice)
+        if action:
+            action()
         else:
             print('Invalid choice. Please select a valid option.')
 
 
+_DEFAULT_LIST_MENU = (
+    f"{BColors.HEADER}Default Shopping List Management{BColors.END_C}\n"
+    '1. Add a new default shopping list\n'
+    '2. Edit an existing default shopping list\n'
+    '3. Delete a default shopping list\n'
+    '0. Return to main menu'
+)
+_DEFAULT_LIST_ACTIONS = {
+    '1': lambda: add_default_shopping_list(input('Enter the name of the new shopping list: ')),
+    '2': edit_default_shopping_list,
+    '3': lambda: delete_default_shopping_list(input('Enter the name of the shopping list to delete: ')),
+}
+
+
 def default_shopping_list_menu():
     """
     Displays the default shopping list management menu and handles user choices.
     """
     while True:
-        print(f"{BColors.HEADER}Default Shopping List Management{BColors.END_C}")
-        print('1. Add a new default shopping list')
-        print('2. Edit an existing default shopping list')
-        print('3. Delete a default shopping list')
-        print('0. Return to main menu')
+        print(_DEFAULT_LIST_MENU)
 
         choice = input('Enter your choice: ')
 
         if choice == '0':
             break
-        elif choice == '1':
-            list_name = input('Enter the name of the new shopping list: ')
-            add_default_shopping_list(list_name)
-        elif choice == '2':
-            edit_default_shopping_list()
-        elif choice == '3':
-            list_name = input('Enter the name of the shopping list to delete: ')
-            delete_default_shopping_list(list_name)
+        action = _DEFAULT_LIST_ACTIONS.get(choice)
+        if action:
+            action()
         else:
             print('Invalid choice. Please select a valid option.')
 
 
+_ADMIN_MENU = (
+    f"{BColors.HEADER}Administrator Options{BColors.END_C}\n"
+    '1. Edit items\n'
+    '2. Manually override quantity\n'
+    '"del". Remove items from inventory database table\n'
+    '0. Main menu'
+)
+_ADMIN_ACTIONS = {
+    '1': edit_inventory_item,
+    '2': manual_qty_adjust,
+    'del': remove_item_permanently,
+}
+
+
 def admin_menu():
     while True:
-        print(f"{BColors.HEADER}Administrator Options{BColors.END_C}")
-        print('1. Edit items')
-        print('2. Manually override quantity')
-        print('"del". Remove items from inventory database table')
-        print('0. Main menu')
+        print(_ADMIN_MENU)
 
         choice = input('Enter your choice: ')
 
         if choice == '0':
             return
-        elif choice == '1':
-            edit_inventory_item()
-        elif choice == '2':
-            manual_qty_adjust()
-        elif choice == 'del':
-            remove_item_permanently()
-
+        action = _ADMIN_ACTIONS.get(choice)
+        if action:
+            action()
         else:
             print('Invalid choice. Please select a valid option.')
 
 
+_MAIN_MENU = (
+    f"{BColors.HEADER}GroceryListDB{BColors.END_C}\n"
+    '1. Add items to inventory\n'
+    '2. Remove items from inventory\n'
+    '3. Create shopping list\n'
+    '4. Set up default shopping lists\n'
+    '5. Historical shopping lists\n'
+    '6. Reports\n'
+    '7. Administrator Options\n'
+    '0. Exit'
+)
+_MAIN_ACTIONS = {
+    '1': user_items_to_inventory,
+    '2': user_items_from_inventory,
+    '3': lambda: print_shopping_list(create_shopping_list()),
+    '4': default_shopping_list_menu,
+    '5': print_historical_list,
+    '6': reports_menu,
+    '7': admin_menu,
+}
+
+
 def main_menu():
     """
     Displays the main menu and handles user choices.
     """
     while True:
-        print(f"{BColors.HEADER}GroceryListDB{BColors.END_C}")
-        print('1. Add items to inventory')
-        print('2. Remove items from inventory')
-        print('3. Create shopping list')
-        print('4. Set up default shopping lists')
-        print('5. Historical shopping lists')
-        print('6. Reports')
-        print('7. Administrator Options')
-        print('0. Exit')
+        print(_MAIN_MENU)
 
         choice = input('Enter your choice: ')
 
         if choice == '0':
             quit(0)
-        elif choice == '1':
-            user_items_to_inventory()
-        elif choice == '2':
-            user_items_from_inventory()
-        elif choice == '3':
-            print_shopping_list(create_shopping_list())
-        elif choice == '4':
-            default_shopping_list_menu()
-        elif choice == '5':
-            print_historical_list()
-        elif choice == '6':
-            reports_menu()
-        elif choice == '7':
-            admin_menu()
+        action = _MAIN_ACTIONS.get(choice)
+        if action:
+            action()
         else:
             print('Invalid choice. Please select a valid option.')
 
 
 if __name__ == "__main__":
     os.makedirs('./.data', exist_ok=True)
+    # Create or migrate both schemas up front; the checks are cached, so later calls are free
+    check_current_db()
+    check_history_db()
+    # Parsed once at startup; every printer connection reuses it
     printer_config = read_config()
-    # Tests printer connection
-    try:
-        p = printer_connect(printer_config)
-    except exceptions.USBNotFoundError:
-        print(f'{BColors.WARNING} Printer not connected!{BColors.END_C}')
+    # Printer line width and a full-width rule, used for every printed line
+    CHR_WIDTH = printer_config['chr_width']
+    LINE = '-' * CHR_WIDTH
+    # The printer is only opened by use_printer when something is printed
     main_menu()